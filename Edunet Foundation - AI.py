@@ -1,63 +1,273 @@
-''' The specific topic or concept related to the provided code is sentiment analysis in Python using TextBlob, particularly in the context of analyzing restaurant reviews.'''
-import nltk
-from textblob import TextBlob
-import matplotlib.pyplot as plt
+''' The specific topic or concept related to the provided code is sentiment analysis in Python using a lexicon approximation of VADER (its word valences and negation rule, not its full rule set), particularly in the context of analyzing restaurant reviews.'''
+import argparse
+import csv
+import importlib.util
+import os
+import re
+import sys
+import string
+from datetime import datetime
+from multiprocessing import Pool, cpu_count
+from itertools import chain
+import numpy as np
+from vaderSentiment.vaderSentiment import NEGATE, N_SCALAR, SentimentIntensityAnalyzer
 import pandas as pd
 
+# One timestamp per run, shared by every output file it writes.
+RUN_TS = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+_PUNCT_TBL = str.maketrans('', '', string.punctuation)
+_WS_RE = re.compile(r'\s+')
+# Squashes a valence sum into [-1, 1]; the constant VADER's compound score uses.
+NORMALIZE_ALPHA = 15
+_NEGATE = frozenset(word.replace("'", '') for word in NEGATE)
+
+# Smaller batches are scored in-process, where pool start-up and pickling
+# the reviews would cost more than the scoring itself.
+PARALLEL_MIN_REVIEWS = 200_000
+PARALLEL_CHUNK_SIZE = 50_000
+
+# Indexed by the labels classify_and_count writes.
+SENTIMENT_LABELS = ("0", "1")
+
+def score_reviews(reviews, lexicon):
+    # A missing review (NaN from an empty TSV field) scores 0, as in polars.
+    cleaned = (pd.Series(reviews, dtype=object).fillna('').str.lower().str.translate(_PUNCT_TBL)
+               .str.replace(_WS_RE, ' ', regex=True).str.strip())
+    # Repeated reviews (greetings, stock complaints) are scored only once.
+    codes, unique = pd.factorize(cleaned)
+    tokens = pd.Series(unique, dtype=object).str.split().tolist()
+    n = len(tokens)
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=n)
+    words = list(chain.from_iterable(tokens))
+    scores = np.fromiter((lexicon.get(word, 0.0) for word in words), dtype=float, count=len(words))
+    owner = np.repeat(np.arange(n), lengths)
+
+    # Like VADER, dampen and flip a valence when one of the three words
+    # before it (in the same review) is a negation.
+    negated = np.fromiter((word in _NEGATE for word in words), dtype=bool, count=len(words))
+    for k in (1, 2, 3):
+        flip = np.zeros(len(words), dtype=bool)
+        flip[k:] = negated[:-k] & (owner[:-k] == owner[k:])
+        scores[flip] *= N_SCALAR
+
+    # Segment-sum the token valences per review and squash the sum into
+    # [-1, 1].
+    total = np.bincount(owner, weights=scores, minlength=n)
+    polarity = total / np.sqrt(total * total + NORMALIZE_ALPHA)
+    return polarity[codes]
+
+def score_reviews_polars(reviews, lexicon):
+    # Same scoring as score_reviews, expressed as polars expressions so the
+    # per-token work runs in polars' native kernels.
+    import polars as pl
+    tokens = (pl.DataFrame({'review': pl.Series(reviews, dtype=pl.String)})
+              .with_row_index('row')
+              .select('row', pl.col('review').str.to_lowercase()
+                      .str.replace_many(dict.fromkeys(string.punctuation, ''))
+                      .str.replace_all(r'\s+', ' ').str.strip_chars()
+                      .str.split(' ').alias('word'))
+              .explode('word'))
+    negated = pl.col('word').is_in(list(_NEGATE))
+    preceding_negations = pl.sum_horizontal(
+        [(negated.shift(k) & (pl.col('row').shift(k) == pl.col('row'))).fill_null(False).cast(pl.Int32)
+         for k in (1, 2, 3)])
+    totals = (tokens
+              .with_columns(valence=pl.col('word').replace_strict(lexicon, default=0.0, return_dtype=pl.Float64)
+                            * pl.lit(N_SCALAR).pow(preceding_negations))
+              .group_by('row', maintain_order=True)
+              .agg(pl.col('valence').sum()))
+    total = totals['valence'].to_numpy()
+    return total / np.sqrt(total * total + NORMALIZE_ALPHA)
+
+def classify_and_count(polarity, labels, counts):
+    # Labels each review and tallies the labels. A fused numba loop was
+    # tried here, but the branchy per-element count doesn't vectorize and
+    # ran ~10x slower than these two NumPy calls.
+    np.greater(polarity, 0, out=labels, casting='unsafe')
+    positive = np.count_nonzero(labels)
+    counts[0] += len(labels) - positive
+    counts[1] += positive
+
+def summarize_scores(scores):
+    # Four plain reductions: a fused single-pass (Welford) numba loop was
+    # tried and ran ~2x slower, since its per-element division and serial
+    # dependency cost more than the extra passes over a float32 array.
+    return float(scores.mean()), float(scores.min()), float(scores.max()), float(scores.std())
+
+def _usable_cpus():
+    # cpu_count() reports the host's CPUs; the affinity mask is what this
+    # process may actually run on (not available on every platform).
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return cpu_count()
+
+_worker_lexicon = None
+
+def _init_worker():
+    global _worker_lexicon
+    _worker_lexicon = SentimentIntensityAnalyzer().lexicon
+
+def _score_chunk(job):
+    index, chunk = job
+    return index, score_reviews(chunk, _worker_lexicon)
+
 class Restaurant:
-    def __init__(self):
-        self.greetings = ["hello", "hi", "hey", "greetings", "sup", "what's up"]
+    def __init__(self, engine='pandas'):
+        self.greetings = frozenset(("hello", "hi", "hey", "greetings", "sup", "what's up"))
         self.name = "Restaurant Owner"
         self.sentiment_counts = {"1": 0, "0": 0}
+        self.sentiment_scores = np.empty(0, dtype=np.float32)
+        self._reviews = np.empty(0, dtype=object)
+        self._sentiments = np.empty(0, dtype=object)
+        if engine not in ('pandas', 'polars'):
+            raise ValueError(f"engine must be 'pandas' or 'polars', not {engine!r}")
+        # polars is optional; without it the pandas engine is used.
+        if engine == 'polars' and importlib.util.find_spec('polars') is None:
+            engine = 'pandas'
+        self.engine = engine
+        self._lex = self.load_lexicon()
+
+    def load_lexicon(self):
+        # VADER's lexicon maps a word to a valence in [-4, 4]; load it once
+        # and reuse it for the batched scorer. The scorer only approximates
+        # VADER: it lowercases and strips punctuation and keeps just the
+        # negation rule, so casing, '!', 'but', boosters and emoticons are
+        # ignored and scores differ from polarity_scores() on some reviews.
+        return SentimentIntensityAnalyzer().lexicon
 
-    def get_sentiment(self, text):
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        if polarity <= 0:
-            sentiment = "0"
+    def get_sentiment(self, reviews):
+        reviews = pd.Series(reviews, dtype=object)
+        # float32 is plenty for a score in [-1, 1] and halves the buffer.
+        polarity = np.empty(len(reviews), dtype=np.float32)
+        if self.engine == 'polars':
+            polarity[:] = score_reviews_polars(reviews, self._lex)
+        elif len(reviews) < PARALLEL_MIN_REVIEWS or _usable_cpus() < 2:
+            polarity[:] = score_reviews(reviews, self._lex)
         else:
-            sentiment = "1"
-        return sentiment
+            chunks = [reviews.iloc[i:i + PARALLEL_CHUNK_SIZE] for i in range(0, len(reviews), PARALLEL_CHUNK_SIZE)]
+            with Pool(_usable_cpus(), initializer=_init_worker) as pool:
+                for index, chunk_polarity in pool.imap_unordered(_score_chunk, enumerate(chunks)):
+                    start = index * PARALLEL_CHUNK_SIZE
+                    polarity[start:start + len(chunk_polarity)] = chunk_polarity
 
-    def feedback(self):
-        print(f"{self.name}: Hi! I am Restaurant Owner. How can I help you?")
-        while True:
-            try:
-                user_input = next(self.input_iterator)
-            except StopIteration:
-                print(f"{self.name}: Goodbye!")
-                break
+        labels = np.empty(len(polarity), dtype=np.int8)
+        counts = np.zeros(len(SENTIMENT_LABELS), dtype=np.int64)
+        classify_and_count(polarity, labels, counts)
+        sentiment = np.array(SENTIMENT_LABELS)[labels]
+        return sentiment, polarity, counts
+
+    def load_data(self, data_file):
+        # Reviews are unquoted free text that contains stray double quotes,
+        # so no engine treats '"' as a quote character.
+        if self.engine == 'polars':
+            import polars as pl
+            data = pl.scan_csv(data_file, separator='\t', quote_char=None).collect()
+            return self._check_columns(data, data_file)
+
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pacsv
+        except ImportError:
+            return self._check_columns(self._read_tsv(data_file), data_file)
+
+        try:
+            table = pacsv.read_csv(data_file, parse_options=pacsv.ParseOptions(delimiter='\t', quote_char=False),
+                                   convert_options=pacsv.ConvertOptions(column_types={'Review': pa.large_string()}))
+        except pa.ArrowInvalid:
+            # pyarrow rejects rows with missing fields, which pandas pads with
+            # NaN (the bundled TSV ends with two such rows).
+            return self._check_columns(self._read_tsv(data_file), data_file)
+        return self._check_columns(table.to_pandas(types_mapper=pd.ArrowDtype), data_file)
 
-            print("Customer:", user_input)
+    def _read_tsv(self, data_file):
+        data = pd.read_csv(data_file, delimiter='\t', quoting=csv.QUOTE_NONE)
+        # When every row has one field more than the header, pandas quietly
+        # uses the first field as the index; polars rejects such a file.
+        if not isinstance(data.index, pd.RangeIndex):
+            raise ValueError(f"{data_file} has rows with more fields than its header")
+        return data
 
-            if user_input in self.greetings:
-                print(f"{self.name}: Hello! How can I assist you?")
-                continue
+    def _check_columns(self, data, data_file):
+        if 'Review' not in data.columns:
+            raise ValueError(f"{data_file} has no 'Review' column")
+        return data
 
-            sentiment = self.get_sentiment(user_input)
-            if sentiment == "1":
-                print(f"Prediction: {sentiment} (You expressed a Positive Review)")
+    def feedback(self, reviews):
+        print(f"{self.name}: Hi! I am Restaurant Owner. How can I help you?")
+        reviews = pd.Series(np.asarray(reviews, dtype=object))
+        is_greeting = reviews.str.lower().isin(self.greetings)
+        reviews = reviews[~is_greeting]
+
+        sentiment, polarity, counts = self.get_sentiment(reviews)
+        for label, count in zip(SENTIMENT_LABELS, counts.tolist()):
+            self.sentiment_counts[label] += count
+        self._reviews, self._sentiments, self.sentiment_scores = reviews.to_numpy(), sentiment, polarity
+
+        print(f"{self.name}: Processed {len(reviews)} reviews "
+              f"({self.sentiment_counts['1']} Positive, {self.sentiment_counts['0']} Negative), "
+              f"skipped {int(is_greeting.sum())} greetings.")
+        print(f"{self.name}: Goodbye!")
 
-            else:
-                print(f"Prediction: {sentiment} (You expressed a Negative Review)")
+    def print_summary(self):
+        scores = self.sentiment_scores
+        if not scores.size:
+            print(f"{self.name}: No reviews were scored.")
+            return
+        mean, low, high, std = summarize_scores(scores)
+        print(f"{self.name}: Polarity mean {mean:.3f}, min {low:.3f}, max {high:.3f}, std {std:.3f}")
 
-            self.sentiment_counts[sentiment] += 1
+    def save_results(self):
+        # Per-review predictions go to one CSV instead of being printed.
+        if not self._reviews.size:
+            print(f"{self.name}: No reviews were scored.")
+            return None
+        output_file = f"sentiment_results_{RUN_TS}.csv"
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['review', 'sentiment', 'polarity'])
+            writer.writerows(zip(self._reviews, self._sentiments, self.sentiment_scores.astype(str)))
+        print(f"{self.name}: Saved predictions for {len(self._reviews)} reviews to {output_file}")
+        return output_file
 
     def plot_sentiment_percentages(self):
-       labels = ['Positive', 'Negative']  # Updated labels
-       sizes = [self.sentiment_counts['1'], self.sentiment_counts['0']]
-       colors = ['green', 'red']
-       explode = (0.1, 0)
+        # Matplotlib is only needed for the chart, so import it here rather
+        # than paying for it at start-up. With no display to open a window
+        # on, skip probing the GUI backends and render off-screen.
+        import matplotlib
+        if (sys.platform.startswith('linux') and 'MPLBACKEND' not in os.environ
+                and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))):
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
 
-       plt.pie(sizes, explode = explode,labels=labels, colors=colors, autopct='%1.1f%%',shadow=True, startangle=140)
-       plt.axis('equal')
-       plt.title("Sentimental Analysis of Restaurant Reviews")
-       plt.show()
+        labels = ['Positive', 'Negative']  # Updated labels
+        sizes = [self.sentiment_counts['1'], self.sentiment_counts['0']]
+        colors = ['green', 'red']
+        explode = (0.1, 0)
+
+        fig, ax = plt.subplots(figsize=(8, 6))
+        ax.pie(sizes, explode=explode, labels=labels, colors=colors, autopct='%1.1f%%', shadow=True, startangle=140)
+        ax.axis('equal')
+        ax.set_title("Sentimental Analysis of Restaurant Reviews")
+
+        output_file = f"sentiment_pie_{RUN_TS}.png"
+        fig.savefig(output_file)
+        print(f"{self.name}: Saved sentiment chart to {output_file}")
+        if matplotlib.get_backend().lower() != 'agg':
+            plt.show()
+        plt.close(fig)
+        return output_file
 
 
 if __name__ == "__main__":
-    restaurant = Restaurant()
-    data = pd.read_csv('Restaurant_Reviews.tsv', delimiter='\t')
-    restaurant.input_iterator = iter(data['Review'])
-    restaurant.feedback()
+    parser = argparse.ArgumentParser(description="Sentiment analysis of restaurant reviews.")
+    parser.add_argument('--engine', choices=('pandas', 'polars'), default='pandas',
+                        help="dataframe library used to load and score the reviews (polars falls back to pandas if missing)")
+    args = parser.parse_args()
+
+    restaurant = Restaurant(engine=args.engine)
+    data = restaurant.load_data('Restaurant_Reviews.tsv')
+    restaurant.feedback(data['Review'])
+    restaurant.print_summary()
+    restaurant.save_results()
     restaurant.plot_sentiment_percentages()
\ No newline at end of file